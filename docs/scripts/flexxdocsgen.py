@@ -23,5 +23,6 @@ def clean(app, *args):
 
 def setup(app):
     init()
+    app.connect('autodoc-process-docstring', genuiclasses.process_docstring)
     app.connect('build-finished', clean)
 
@@ -11,9 +11,134 @@ from flexx import ui, app, event
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 DOC_DIR = os.path.abspath(os.path.join(THIS_DIR, '..'))
 OUTPUT_DIR = os.path.join(DOC_DIR, 'ui')
+OUTPUT_PREFIX = os.path.join(OUTPUT_DIR, '')  # with trailing separator
+
+# Templates for the generated rst
+PAGE_HEADER_TEMPLATE = '{title}\n{underline}\n\n.. automodule:: {module}\n\n----\n\n'
+AUTOCLASS_TEMPLATE = '.. autoclass:: {name}\n :members:{members}\n :member-order: alphabetical\n\n'
+CLASS_REF_TEMPLATE = ':class:`{name} <{module}.{name}>`'
+OVERVIEW_ITEM_TEMPLATE = '* ' + CLASS_REF_TEMPLATE + '\n'
+MEMBER_REF_TEMPLATE = '`{name} <#{cls_name}.{name}>`__'  # __ means anonymous hyperlink
 
 created_files = []
 
+# Extra docstring lines per class (by full name), inserted by process_docstring()
+class_doc_extras = {}
+
+
+def _write_file(filename, text):
+    """ Write text to the given file (utf-8 encoded).
+    """
+    data = text.encode('utf-8')
+    # The pages are small, so write them with a plain os.write() on a raw fd
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filename, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _render_page(module_name, page):
+    """ Get the filename and rst content for the page of the given module.
+    """
+    # Get page name and title
+    classes, page_title, page_name = page
+    mod = sys.modules[module_name]
+    mdoc_parts = (mod.__doc__ or '').split('\n', 1)
+    if 0 < len(mdoc_parts[0].strip()) <= 24:
+        page_title = mdoc_parts[0].strip()
+        mod.__doc__ = mdoc_parts[-1]
+    
+    parts = [PAGE_HEADER_TEMPLATE.format(title=page_title,
+                                         underline='-' * len(page_title),
+                                         module=module_name)]
+    
+    # Include more docs?
+    if module_name.endswith('_widget'):
+        parts.append('.. autofunction:: flexx.ui.create_element\n\n')
+    
+    for cls in classes:
+        assert issubclass(cls, (ui.Widget, ui.PyWidget)), cls.__name__ + " is not a Widget or PyWidget"
+        name = cls.__name__
+        
+        members = {}
+        include = '_create_dom', '_render_dom'
+        exclude = 'CODE', 'CSS', 'DEFAULT_MIN_SIZE'
+        
+        # Collect all stuff that's on the class.
+        for n in list(cls.JS.__dict__):
+            val = getattr(cls.JS, n)
+            if n in exclude or not val.__doc__:
+                pass
+            elif n.startswith('_') and n not in include:
+                pass
+            elif isinstance(val, event._action.BaseDescriptor):
+                for tname, tclass in (('attributes', event._attribute.Attribute),
+                                      ('properties', event._property.Property),
+                                      ('actions', event._action.ActionDescriptor),
+                                      ('reactions', event._reaction.ReactionDescriptor),
+                                      ('emitters', event._emitter.EmitterDescriptor)):
+                    if isinstance(val, tclass):
+                        members.setdefault(tname, []).append(n)
+                        break
+                else:
+                    assert False
+            elif getattr(val, '__doc__', None):
+                members.setdefault('methods', []).append(n)
+        
+        # Get canonical name
+        if getattr(ui, name, None):
+            full_name = 'flexx.ui.' + name
+        else:
+            full_name = module_name + '.' + name
+        
+        # Insert info on base clases (the class may not have a docstring)
+        head_lines = []
+        if 'Inherits from' not in (cls.__doc__ or ''):
+            bases = []
+            for bcls in cls.__bases__:
+                bname = bcls.__name__
+                if getattr(ui, bname, None):
+                    module = 'flexx.ui'
+                elif getattr(app, bname, None):
+                    module = 'flexx.app'
+                else:
+                    module = bcls.__module__
+                bases.append(CLASS_REF_TEMPLATE.format(name=bname, module=module))
+            head_lines = ['*Inherits from:* ' + ', '.join(bases), '']
+        
+        # Sort and combine
+        order = 'attributes', 'properties', 'emitters', 'actions', 'reactions', 'methods'
+        member_names = []
+        toc_lines = ['']
+        for key in members:
+            members[key].sort()
+        assert not set(members).difference(order)
+        for key in order:
+            if key in members:
+                # Add to member list and toc
+                member_names.extend(members[key])
+                toc_lines.append('*' + key + '*: ' +
+                                 ', '.join([MEMBER_REF_TEMPLATE.format(name=n, cls_name=full_name)
+                                            for n in members[key]]))
+                toc_lines.append('')
+                # Hack: put members back on Python class to have them documented
+                for n in members[key]:
+                    if n not in cls.__dict__:
+                        setattr(cls, n, cls.JS.__dict__[n])
+        class_doc_extras[full_name] = head_lines, toc_lines
+        
+        # Create rst for class
+        member_str = ' ' + ', '.join(member_names) if member_names else ''
+        parts.append(AUTOCLASS_TEMPLATE.format(name=full_name, members=member_str))
+    
+    filename = OUTPUT_PREFIX + page_name + '.rst'
+    return filename, ''.join(parts)
+
+
 def main():
     
     pages = {}
@@ -22,141 +147,76 @@ def main():
     
     # Get all pages and class names
     namespace = {}; namespace.update(ui.__dict__); namespace.update(ui.layouts.__dict__); namespace.update(ui.widgets.__dict__); namespace.update(ui.pywidgets.__dict__)
+    component_classes = app.PyComponent, app.JsComponent
+    layout_class = ui.Layout
     for mod in namespace.values():
         if isinstance(mod, ModuleType):
-            classes = []
-            for w in mod.__dict__.values():
-                if isinstance(w, type) and issubclass(w, (app.PyComponent, app.JsComponent)):
-                    if w.__module__ == mod.__name__ and not w.__name__.startswith("_"):
-                        classes.append(w)
-                        if issubclass(w, ui.Layout):
-                            layouts.add(w.__name__)
+            # Cheap checks first, so that we only do issubclass() on classes
+            # that are actually defined in this module.
+            mod_name = mod.__name__
+            classes = [w for w in vars(mod).values()
+                       if isinstance(w, type) and
+                       w.__module__ == mod_name and
+                       not w.__name__.startswith('_') and
+                       issubclass(w, component_classes)]
+            layouts.update(w.__name__ for w in classes if issubclass(w, layout_class))
             if classes:
                 classes.sort(key=lambda x: x.__name__)
-                classes.sort(key=lambda x: len(x.mro()))
+                classes.sort(key=lambda x: len(x.__mro__))
                 class_names.extend([w.__name__ for w in classes])
-                pages[mod.__name__] = classes
+                # Page title and (lowercase) name, e.g. Hv and hv for flexx.ui.layouts._hv
+                short_name = mod_name.rpartition('.')[2].strip('_')
+                pages[mod_name] = classes, short_name.capitalize(), short_name.lower()
+    
+    # Sort once, use for the module pages and the overview page
+    sorted_pages = sorted(pages.items())
+    sorted_page_names = [page[2] for _, page in sorted_pages]
+    sorted_class_names = sorted(set(class_names))
     
     # Create page for each module
-    for module_name, classes in sorted(pages.items()):
-        # Get page name and title
-        page_name = page_title = module_name.split('.')[-1].strip('_').capitalize()
-        mdoc = sys.modules[module_name].__doc__
-        if mdoc and 0 < len(mdoc.split('\n', 1)[0].strip()) <= 24:
-            page_title = mdoc.split('\n', 1)[0].strip()
-            sys.modules[module_name].__doc__ = sys.modules[module_name].__doc__.split('\n', 1)[-1]
-        
-        docs = '%s\n%s\n\n' % (page_title, '-' * len(page_title))
-        docs += '.. automodule:: %s\n\n' % module_name
-        docs += '----\n\n'
-        
-        # Include more docs?
-        if module_name.endswith('_widget'):
-            docs += '.. autofunction:: flexx.ui.create_element\n\n'
-        
-        for cls in classes:
-            assert issubclass(cls, (ui.Widget, ui.PyWidget)), cls.__name__ + " is not a Widget or PyWidget"
-            name = cls.__name__
-            
-            # Insert info on base clases
-            if 'Inherits from' not in cls.__doc__:
-                bases = []
-                for bcls in cls.__bases__:
-                    if getattr(ui, bcls.__name__, None):
-                        bases.append(':class:`%s <flexx.ui.%s>`' % (bcls.__name__, bcls.__name__))
-                    elif getattr(app, bcls.__name__, None):
-                        bases.append(':class:`%s <flexx.app.%s>`' % (bcls.__name__, bcls.__name__))
-                    else:
-                        bases.append(':class:`%s <%s.%s>`' % (bcls.__name__, bcls.__module__, bcls.__name__))
-                line = '    *Inherits from:* ' + ', '.join(bases)
-                cls.__doc__ = line + '\n\n    ' + (cls.__doc__ or '').lstrip()
-            
-            members = {}
-            include = '_create_dom', '_render_dom'
-            exclude = 'CODE', 'CSS', 'DEFAULT_MIN_SIZE'
-            
-            # Collect all stuff that's on the class.
-            for n in list(cls.JS.__dict__):
-                val = getattr(cls.JS, n)
-                if n in exclude or not val.__doc__:
-                    pass
-                elif n.startswith('_') and n not in include:
-                    pass
-                elif isinstance(val, event._action.BaseDescriptor):
-                    for tname, tclass in (('attributes', event._attribute.Attribute),
-                                          ('properties', event._property.Property),
-                                          ('actions', event._action.ActionDescriptor),
-                                          ('reactions', event._reaction.ReactionDescriptor),
-                                          ('emitters', event._emitter.EmitterDescriptor)):
-                        if isinstance(val, tclass):
-                            members.setdefault(tname, []).append(n)
-                            break
-                    else:
-                        assert False
-                elif getattr(val, '__doc__', None):
-                    members.setdefault('methods', []).append(n)
-            
-            # Get canonical name
-            full_name = '%s.%s' % (module_name, name)
-            if getattr(ui, name, None):
-                full_name = 'flexx.ui.%s' % name
-            
-            # Sort and combine
-            order = 'attributes', 'properties', 'emitters', 'actions', 'reactions', 'methods'
-            member_str = ' :members:'
-            toc_str = '\n'
-            for key in members:
-                members[key].sort()
-            assert not set(members).difference(order)
-            for key in order:
-                if key in members:
-                    # Add to member string and toc
-                    toc_str = toc_str.rstrip(',') + '\n\n    *{}*:'.format(key)
-                    for n in members[key]:
-                        member_str += ' {},'.format(n)
-                        toc_str += ' `{} <#{}.{}>`__,'.format(n, full_name, n)  # __ means anonymous hyperlink
-                    # Hack: put members back on Python class to have them documented
-                    for n in members[key]:
-                        if n not in cls.__dict__:
-                            setattr(cls, n, cls.JS.__dict__[n])
-            cls.__doc__ += toc_str.rstrip(',') + '\n\n'
-            
-            # Create rst for class
-            docs += '.. autoclass:: %s\n' % full_name
-            docs += member_str.rstrip(',') + '\n :member-order: alphabetical\n\n'
-        
-        # Write doc page
-        filename = os.path.join(OUTPUT_DIR, page_name.lower() + '.rst')
+    for module_name, page in sorted_pages:
+        filename, text = _render_page(module_name, page)
         created_files.append(filename)
-        open(filename, 'wt', encoding='utf-8').write(docs)
+        _write_file(filename, text)
     
     # Create overview doc page
-    docs = 'Widgets reference'
-    docs += '\n' + '=' * len(docs) + '\n\n'
-    docs += 'This is a list of all widget classes provided by ``flexx.ui``. '
-    docs += 'The :class:`Widget <flexx.ui.Widget>` class is the base class of all widgets. '
-    docs += '\n\n'
-    docs += '\nBase widget:\n\n'
+    title = 'Widgets reference'
+    parts = [title, '\n', '=' * len(title), '\n\n']
+    parts.append('This is a list of all widget classes provided by ``flexx.ui``. ')
+    parts.append('The :class:`Widget <flexx.ui.Widget>` class is the base class of all widgets. ')
+    parts.append('\n\n')
+    parts.append('\nBase widget:\n\n')
     if True:
-        docs += '* :class:`%s <flexx.ui.%s>`\n' % ('Widget', 'Widget')
-    docs += '\nLayouts:\n\n'
-    for name in [n for n in sorted(class_names) if n in layouts if getattr(ui, n, None)]:
-        docs += '* :class:`%s <flexx.ui.%s>`\n' % (name, name)
-    docs += '\nWidgets:\n\n'
-    for name in [n for n in sorted(class_names) if n not in layouts if getattr(ui, n, None)]:
-        docs += '* :class:`%s <flexx.ui.%s>`\n' % (name, name)
-    docs += '\n.. toctree::\n  :maxdepth: 1\n  :hidden:\n\n'
-    for module_name in sorted(pages.keys()):
-        docs += '  %s\n' % module_name.split('.')[-1].strip('_').lower()
+        parts.append(OVERVIEW_ITEM_TEMPLATE.format(name='Widget', module='flexx.ui'))
+    parts.append('\nLayouts:\n\n')
+    for name in [n for n in sorted_class_names if n in layouts if getattr(ui, n, None)]:
+        parts.append(OVERVIEW_ITEM_TEMPLATE.format(name=name, module='flexx.ui'))
+    parts.append('\nWidgets:\n\n')
+    for name in [n for n in sorted_class_names if n not in layouts if getattr(ui, n, None)]:
+        parts.append(OVERVIEW_ITEM_TEMPLATE.format(name=name, module='flexx.ui'))
+    parts.append('\n.. toctree::\n  :maxdepth: 1\n  :hidden:\n\n')
+    for page_name in sorted_page_names:
+        parts.extend(('  ', page_name, '\n'))
     
     # Write overview doc page
-    filename = os.path.join(OUTPUT_DIR, 'api.rst')
+    filename = OUTPUT_PREFIX + 'api.rst'
     created_files.append(filename)
-    open(filename, 'wt', encoding='utf-8').write(docs)
+    _write_file(filename, ''.join(parts))
  
     print('  generated widget docs with %i pages and %i widgets' % (len(pages), len(class_names)))
 
 
+def process_docstring(sphinx_app, what, name, obj, options, lines):
+    """ Handler for autodoc-process-docstring that adds the base classes and
+    member toc to the docstrings of the widget classes. This way we don't
+    have to modify the ``__doc__`` of the (live) classes.
+    """
+    if what == 'class' and name in class_doc_extras:
+        head_lines, toc_lines = class_doc_extras[name]
+        lines[:0] = head_lines
+        lines.extend(toc_lines)
+
+
 def clean():
     while created_files:
         filename = created_files.pop()
@@ -73,7 +73,7 @@ the real browser DOM.
 
 """
 
-from pscript import undefined, window, RawJS
+from pscript import undefined, window, this_is_js
 
 from ..event import loop
 from .. import event, app
@@ -81,6 +81,10 @@ from .. import event, app
 from . import logger  # noqa
 
 
+# Shared (frozen) props object for vnodes without props, created in JS
+_EMPTY_PROPS = None
+
+
 def create_element(type, props=None, *children):
     """ Convenience function to create a dictionary to represent
     a virtual DOM node. Intended for use inside ``Widget._render_dom()``.
@@ -90,19 +94,185 @@ def create_element(type, props=None, *children):
     insert raw HTML, use the ``innerHTML`` prop, but be careful not to
     include user-defined text, as this may introduce openings for XSS attacks.
 
-    The returned dictionary has three fields: type, props, children.
+    The special ``key`` prop can be used to identify a node among its
+    siblings. When the children of a node are reordered, nodes with a key
+    are moved rather than updated in place (or re-created). The special
+    ``memo`` prop can be set to a value (e.g. a string or number) that
+    represents the content of the node; if it is equal to the value used in
+    the previous render, the props and children of the node are not updated.
+
+    The returned dictionary has three fields: type, props, children. It also
+    has a field "__flx", which marks it as a valid virtual node (with a
+    lowercase type) so that it can be resolved without further checks.
     """
+    if props is None or props is undefined:
+        if this_is_js():
+            global _EMPTY_PROPS
+            if _EMPTY_PROPS is None:
+                _EMPTY_PROPS = window.Object.freeze({})
+            props = _EMPTY_PROPS
+        else:
+            props = {}
     if len(children) == 0:
         children = None  # i.e. don't touch children
     elif len(children) == 1 and isinstance(children[0], list):
         children = children[0]
 
-    return dict(type=type,
-                props=props or {},
+    return dict(type=type.lower(),
+                props=props,
                 children=children,
+                __flx=True,
                 )
 
 
+# Parsed style strings for apply_style(): style -> {pairs, limits}
+_style_cache = {}
+_style_cache_size = 0
+
+_div_template = None  # Cloned to create the node of widgets that are plain divs
+
+
+def _get_class_chain(cls):
+    """ Get the css class names for the given widget class (i.e. prototype),
+    e.g. "flx-Button flx-BaseButton flx-Widget". The result is stored on the
+    class, so each class in the hierarchy is only processed once.
+    """
+    if not cls.hasOwnProperty('__flx_class_chain'):
+        chain = 'flx-' + cls.__name__
+        if cls is not Widget.prototype:
+            chain += ' ' + _get_class_chain(cls._base_class)
+        cls.__flx_class_chain = chain
+    return cls.__flx_class_chain
+
+
+# The DOM events of all widgets are handled by a few listeners on the document
+# (i.e. event delegation), that dispatch the events to the widgets that the
+# target node is part of. This maps event types to the widget methods.
+_DELEGATED_EVENTS = {'wheel': '_on_wheel',
+                     'keydown': 'key_down',
+                     'keyup': 'key_up',
+                     'keypress': 'key_press',
+                     'mousedown': 'pointer_down',
+                     'mousemove': '_on_mmove_inside',
+                     'mouseup': '_on_mup_inside',
+                     'click': 'pointer_click',
+                     'dblclick': 'pointer_double_click',
+                     'touchstart': 'pointer_down',
+                     'touchmove': '_on_move',
+                     'touchend': 'pointer_up',
+                     'touchcancel': 'pointer_cancel',
+                     'losecapture': '_on_losecapture',
+                     }
+
+_capturing_widgets = []  # The widgets that currently capture the mouse
+
+# Tables used when creating pointer and key events
+_MOD_KEYS = ('Alt', 'Shift', 'Ctrl', 'Meta')
+_BUTTON_MAP = (1, 3, 2, 4, 5)  # JS button -> our button (as in JS "which")
+_BUTTON_TO_MASK = (1, 4, 2, 8, 16)  # JS button -> bit in JS buttons
+_WHEEL_MULT = (1, 16, 600)  # JS deltaMode -> pixels
+_KEY_REMAP = {'Esc': 'Escape', 'Del': 'Delete'}  # IE key names
+
+# The modifiers list for each combination of modifier keys (as a 4-bit mask)
+_MODIFIER_LISTS = [[_MOD_KEYS[i] for i in range(4) if mask & (1 << i)]
+                   for mask in range(16)]
+
+
+def _get_modifiers(e):
+    """ Get the list of modifier keys for the given DOM event. The result is
+    stored on the event, since it is dispatched to all widgets up the tree.
+    The list is shared, so copy it before putting it in an emitted event.
+    """
+    modifiers = e.__flx_modifiers
+    if modifiers is undefined:
+        mask = 0  # bits as in _MOD_KEYS
+        if e.altKey is True:
+            mask |= 1
+        if e.shiftKey is True:
+            mask |= 2
+        if e.ctrlKey is True:
+            mask |= 4
+        if e.metaKey is True:
+            mask |= 8
+        modifiers = e.__flx_modifiers = _MODIFIER_LISTS[mask]
+    return modifiers
+
+
+def _get_event_widgets(e):
+    """ Get the widgets that the target of the given DOM event is part of,
+    innermost first.
+    """
+    widgets = []
+    node = e.target
+    while node is not None and node is not undefined:
+        widget = node.__flx_widget
+        if widget is not undefined and widget._disposed is False:
+            widgets.push(widget)
+        node = node.parentNode
+    return widgets
+
+
+def _dispatch_event(e):
+    # Walk up from the target and call the handler of each widget on the way.
+    # This is called for every (mousemove) event, so we avoid creating a list.
+    if e.__flx_dispatched is True:
+        return  # already dispatched by a listener on a widget's node
+    e.__flx_dispatched = True
+    name = _DELEGATED_EVENTS[e.type]
+    node = e.target
+    while node is not None and node is not undefined:
+        parent = node.parentNode  # get it now, the handler may detach the node
+        widget = node.__flx_widget
+        if widget is not undefined and widget._disposed is False:
+            widget[name](e)
+            if e.cancelBubble:
+                break  # the widget called e.stopPropagation()
+        node = parent
+
+
+def _start_mouse_capture(e):
+    # Called in the capture phase of mousedown, so handle outer widgets first
+    widgets = _get_event_widgets(e)
+    for i in range(len(widgets) - 1, -1, -1):
+        widgets[i]._on_mdown(e)
+
+
+def _on_captured_mousemove(e):
+    # Emit move event
+    e = window.event if window.event else e
+    for widget in _capturing_widgets.slice():
+        if widget._capture_flag == 2 and widget._disposed is False:
+            widget._on_move(e)
+
+
+def _clear_drag_rects(e):
+    # The widgets may have moved on the screen, see _create_pointer_event()
+    for widget in _capturing_widgets:
+        widget._drag_rect = None
+
+
+def _on_captured_mouseup(e):
+    # Emit mouse up event, and stop capturing
+    e = window.event if window.event else e
+    for widget in _capturing_widgets.slice():
+        if widget._capture_flag == 2:  # can hardly be anything else, but be safe
+            widget._stop_capture()
+            if widget._disposed is False:
+                widget.pointer_up(e)
+
+
+def _on_mouse_capture_phase(e):
+    # One listener for the capture phase of the mouse events, which
+    # implements the mouse capturing.
+    type = e.type
+    if type == 'mousemove':
+        _on_captured_mousemove(e)
+    elif type == 'mousedown':
+        _start_mouse_capture(e)
+    elif type == 'mouseup':
+        _on_captured_mouseup(e)
+
+
 class Widget(app.JsComponent):
     """ Base widget class (a :class:`Component <flexx.event.Component>` in JS wrapping
     an `HTML element <https://developer.mozilla.org/docs/Web/HTML/Element>`_).
@@ -129,10 +299,35 @@ class Widget(app.JsComponent):
     When implementing your own widget class, the class attribute
     ``DEFAULT_MIN_SIZE`` can be set to specify a sensible minimum size.
     
+    The DOM events that the emitters (e.g. ``pointer_down`` and ``key_down``)
+    are based on are handled via listeners on the document. When an event
+    has bubbled up to the document, the emitters of the widget that contains
+    the event's target are called, followed by those of its parent widgets.
+    This means that these emitters are called after any listeners on the
+    nodes in between, and that a listener on a node that calls
+    ``e.stopPropagation()`` also prevents the emitters of the widget that
+    contains that node (and of its parents) from being called. Such a
+    listener should call the emitter itself, if needed.
+    
     """
 
     DEFAULT_MIN_SIZE = 0, 0
 
+    # Cache for __render_resolve: prop name -> [path of sub-objects or None, attribute]
+    _PROP_PATHS = {}
+
+    # Widgets that need their size checked in the next animation frame
+    _size_check_queue = []
+
+    # Widgets that have pending move or wheel events to emit in the next frame
+    _pointer_queue = []
+
+    # Set to False in subclasses that call preventDefault() on wheel events
+    _wheel_passive = True
+
+    # Set to False in subclasses that call preventDefault() on touch events
+    _touch_passive = True
+
     CSS = """
 
     .flx-Widget {
@@ -302,11 +497,15 @@ class Widget(app.JsComponent):
             parent_given = False
         
         if parent is None:
-            active_components = loop.get_active_components()
-            for active_component in reversed(active_components):
-                if isinstance(active_component, Widget):
-                    parent = active_component
-                    break
+            # Usually the innermost active component is a widget
+            parent = loop.get_active_component()
+            if parent is not None and not isinstance(parent, Widget):
+                parent = None
+                active_components = loop.get_active_components()
+                for active_component in reversed(active_components):
+                    if isinstance(active_component, Widget):
+                        parent = active_component
+                        break
         # -> we apply via set_parent below
 
         # Use parent session unless session was given
@@ -356,28 +555,35 @@ class Widget(app.JsComponent):
         super()._comp_init_property_values(property_values)
 
         # Create DOM nodes
+        self.__vnodes = window.WeakMap()  # DOM node -> last vnode
         # outernode is the root node
         # node is an inner (representative) node, often the same, but not always
-        nodes = self._create_dom()
-        assert nodes is not None
-        if not isinstance(nodes, list):
-            nodes = [nodes]
-        assert len(nodes) == 1 or len(nodes) == 2
-        if len(nodes) == 1:
-            self.outernode = self.node = self.__render_resolve(nodes[0])
+        if self.__class__._create_dom is Widget.prototype._create_dom:
+            # Fast path for the default _create_dom(), which gives a plain div
+            global _div_template
+            if _div_template is None:
+                _div_template = window.document.createElement('div')
+            self.outernode = self.node = _div_template.cloneNode(False)
         else:
-            self.outernode = self.__render_resolve(nodes[0])
-            self.node = self.__render_resolve(nodes[1])
-
-        # Derive css class name from class hierarchy (needs self.outernode)
-        cls = self.__class__
-        for i in range(32):  # i.e. a safe while-loop
-            self.outernode.classList.add('flx-' + cls.__name__)
-            if cls is Widget.prototype:
-                break
-            cls = cls._base_class
+            nodes = self._create_dom()
+            assert nodes is not None
+            if not isinstance(nodes, list):
+                nodes = [nodes]
+            assert len(nodes) == 1 or len(nodes) == 2
+            if len(nodes) == 1:
+                self.outernode = self.node = self.__render_resolve(nodes[0])
+            else:
+                self.outernode = self.__render_resolve(nodes[0])
+                self.node = self.__render_resolve(nodes[1])
+            # Don't track the props of these, so _render_dom() won't clear them
+            self.outernode.__flx_props = self.node.__flx_props = undefined
+
+        # Derive css class names from class hierarchy (needs self.outernode)
+        chain = _get_class_chain(self.__class__)
+        if self.outernode.className:
+            self.outernode.className += ' ' + chain
         else:
-            raise RuntimeError('Error determining class names for %s' % self.id)
+            self.outernode.className = chain
 
         # Setup JS events to enter Flexx' event system (needs self.node)
         self._init_events()
@@ -433,27 +639,55 @@ class Widget(app.JsComponent):
         and "children". Children is a list consisting of real dom nodes,
         virtual nodes, and strings. Strings are converted to TextNode (XSS safe).
         The ``create_element()`` function makes it easy to create virtual nodes.
+        Virtual nodes must not be modified after they have been returned:
+        a (sub)tree that is the exact same object as in the previous render is
+        assumed to be unchanged, and is skipped. So if you keep a virtual node
+        around, modify it in-place and return it again, the DOM is not updated
+        (and no error is raised). Create new virtual nodes instead.
 
         The default ``_render_dom()`` method simply places the outer node of
         the child widgets as the content of this DOM node, while preserving
         nodes that do not represent a widget. Overload as needed.
         """
-        nodes = []
-        for i in range(len(self.outernode.childNodes)):
-            node = self.outernode.childNodes[i]
-            if not (node.classList and node.classList.contains('flx-Widget')):
-                nodes.push(node)  # push is JS' append
-        for widget in self.children:
-            nodes.push(widget.outernode)
+        # Find the nodes to preserve. If the number of child nodes is what we
+        # rendered last time, and the nodes that we preserved are still there,
+        # we can reuse the result from last time.
+        children = self.children
+        outernode = self.outernode
+        childNodes = outernode.childNodes
+        n = len(childNodes)
+        valid = self.__non_widget_nodes is not undefined and n == self.__rendered_count
+        if valid:
+            for node in self.__non_widget_nodes:
+                if node.parentNode is not outernode:
+                    valid = False  # e.g. replaced by subclass code
+                    break
+        if not valid:
+            self.__non_widget_nodes = non_widget_nodes = []
+            for i in range(n):
+                node = childNodes[i]
+                if not (node.classList and node.classList.contains('flx-Widget')):
+                    non_widget_nodes.push(node)  # push is JS' append
+        elif children is self.__rendered_children:
+            # Return the same list, so that __render() can skip the update
+            return self.__rendered_nodes
+        nodes = self.__non_widget_nodes.slice()
+        for i in range(len(children)):
+            nodes.push(children[i].outernode)
+        self.__rendered_count = len(nodes)
+        self.__rendered_children = children
+        self.__rendered_nodes = nodes
         return nodes
 
     @event.reaction
     def __render(self):
         # Call render method
-        vnode = self._render_dom()
+        vnode = rendered = self._render_dom()
         # Validate output, allow it to return content instead of a vnode
         if vnode is None or vnode is self.outernode:
             return
+        elif vnode is self.__last_vnode:
+            return  # same (immutable) vnode as last time: nothing to update
         elif isinstance(vnode, list):
             vnode = dict(type=self.outernode.nodeName, props={}, children=vnode)
         elif isinstance(vnode, dict):
@@ -463,6 +697,7 @@ class Widget(app.JsComponent):
         else:
             raise TypeError('Widget._render_dom() '
                             'must return None, list or dict.')
+        self.__last_vnode = rendered
         # Resolve
         node = self.__render_resolve(vnode, self.outernode)
         assert node is self.outernode
@@ -473,67 +708,136 @@ class Widget(app.JsComponent):
         """
 
         # Check vnode (we check vnode.children further down)
-        if vnode and vnode.nodeName:  # is DOM node
+        if vnode and vnode.__flx is True:
+            # Fast path for vnodes made with create_element()
+            props = vnode.props
+            type = vnode.type
+        elif vnode and vnode.nodeName:  # is DOM node
             return vnode
         elif isinstance(vnode, str):
             return window.document.createTextNode(vnode)
         elif not isinstance(vnode, dict):
             raise TypeError('Widget._render_dom() needs virtual nodes '
                             'to be dicts, not ' + vnode)
-        if not isinstance(vnode.type, str):
-            raise TypeError('Widget._render_dom() needs virtual node '
-                            'type to be str, not ' + vnode.type)
-        if not isinstance(vnode.props, dict):
-            raise TypeError('Widget._render_dom() needs virtual node '
-                            'props as dict, not ' + vnode.props)
+        else:
+            if not isinstance(vnode.type, str):
+                raise TypeError('Widget._render_dom() needs virtual node '
+                                'type to be str, not ' + vnode.type)
+            props = vnode.props
+            if not isinstance(props, dict):
+                raise TypeError('Widget._render_dom() needs virtual node '
+                                'props as dict, not ' + props)
+            type = vnode.type.toLowerCase()
 
         # Resolve the node itself
-        if node is None or node.nodeName.toLowerCase() != vnode.type.toLowerCase():
-            node = window.document.createElement(vnode.type)
-
-        # Resolve props (i.e. attributes)
-        map = {'css_class': 'className', 'class': 'className'}
-        for key, val in vnode.props.items():
-            ob = node
-            parts = key.replace('__', '.').split('.')
-            for i in range(len(parts)-1):
-                ob = ob[parts[i]]
-            key = parts[len(parts)-1]
-            ob[map.get(key, key)] = val
+        if node is None or node.nodeName.toLowerCase() != type:
+            node = window.document.createElement(type)
+        elif self.__vnodes.get(node) is vnode:
+            return node  # this node was last resolved from the same vnode
+        elif props.memo is not undefined and node.__flx_memo == props.memo:
+            self.__vnodes.set(node, vnode)
+            return node  # memo value unchanged: skip props and children
+        self.__vnodes.set(node, vnode)
+
+        # Resolve props (i.e. attributes). The props that were applied are
+        # stored on the node, so we only need to touch the DOM for changes.
+        old_props = node.__flx_props
+        if old_props is undefined:
+            old_props = {}
+        for key, val in props.items():
+            if old_props[key] is val and key != 'value' and key != 'checked':
+                continue  # unchanged (value and checked can change by the user)
+            path = self._PROP_PATHS[key]
+            if path is undefined:
+                path = self.__prop_path(key)
+            if path[0] is None:
+                node[path[1]] = val  # fast path for the common flat keys
+            else:
+                ob = node
+                for i in range(len(path[0])):
+                    ob = ob[path[0][i]]
+                ob[path[1]] = val
+        for key in old_props.keys():
+            # A prop that is no longer given leaves the DOM untouched (e.g.
+            # clearing className or style would break the widget). Only
+            # our own props (key and memo) are cleared.
+            if key not in props:
+                path = self.__prop_path(key)
+                if path[0] is None and path[1].startswith('__flx_'):
+                    node[path[1]] = undefined
+        node.__flx_props = props
 
         # Resolve content
-        if vnode.children is None:
+        children = vnode.children
+        childNodes = node.childNodes  # a live list
+        if children is None:
             pass  # dont touch it
-        elif isinstance(vnode.children, list):
-            # Truncate children
-            while len(node.childNodes) > len(vnode.children):
-                node.removeChild(node.childNodes[len(node.childNodes)-1])
-            # Resolve children
-            i1 = -1
-            for i2 in range(len(vnode.children)):
-                i1 += 1
-                vsubnode = vnode.children[i2]
+        elif isinstance(children, list):
+            n = len(children)
+            # Collect existing keyed children, so we can match them by key
+            keyed = None
+            for i in range(len(childNodes)):
+                subnode = childNodes[i]
+                if subnode.__flx_key is not undefined:
+                    if keyed is None:
+                        keyed = window.Map()
+                    keyed.set(subnode.__flx_key, subnode)
+            # Resolve children. Nodes that move are inserted at their new
+            # position, nodes that are not used anymore are removed at the end.
+            for i in range(n):
+                vsubnode = children[i]
                 subnode = None
-                if i1 < len(node.childNodes):
-                    subnode = node.childNodes[i1]
+                if i < len(childNodes):
+                    subnode = childNodes[i]
+                    if subnode is vsubnode:
+                        continue  # early exit for real nodes that did not move
                     if subnode.nodeName == "#text" and isinstance(vsubnode, str):
                         if subnode.data != vsubnode:
                             subnode.data = vsubnode
                         continue  # early exit for text nodes
-                new_subnode = self.__render_resolve(vsubnode, subnode)
+                # Select the node to update: by key, or by position
+                ref_node = None
+                key = undefined
+                if vsubnode and not vsubnode.nodeName and vsubnode.props:
+                    key = vsubnode.props.key
+                if key is undefined:
+                    if subnode is not None and subnode.__flx_key is undefined:
+                        ref_node = subnode
+                elif subnode is not None and subnode.__flx_key == key:
+                    ref_node = subnode
+                elif keyed is not None and keyed.has(key):
+                    ref_node = keyed.get(key)
+                new_subnode = self.__render_resolve(vsubnode, ref_node)
                 if subnode is None:
                     node.appendChild(new_subnode)
                 elif subnode is not new_subnode:
                     node.insertBefore(new_subnode, subnode)
-                    node.removeChild(subnode)
+            # Remove nodes that are no longer used
+            while len(childNodes) > n:
+                node.removeChild(node.lastChild)
         else:
             window.flexx_vnode = vnode
             raise TypeError('Widget._render_dom() '
                             'needs virtual node children to be None or list, not %s' %
-                            vnode.children)
+                            children)
 
         return node
 
+    def __prop_path(self, key):
+        """ Get the path to the object and the name of the attribute that
+        a prop (e.g. "style__left") applies to. The path is None for props
+        that apply to the node itself.
+        """
+        path = self._PROP_PATHS[key]
+        if path is undefined:
+            map = {'css_class': 'className', 'class': 'className',
+                   'key': '__flx_key', 'memo': '__flx_memo'}
+            parts = key.replace('__', '.').split('.')
+            name = parts.pop(-1)
+            path = [parts if len(parts) > 0 else None, map.get(name, name)]
+            self._PROP_PATHS[key] = path
+        return path
+
     # Note that this method is only present at the Python side
     # (because the JsComponent meta class makes it so).
     def _repr_html_(self):
@@ -555,13 +859,16 @@ class Widget(app.JsComponent):
         # child is not supposed to be disposed, the developer should orphan the
         # child widget.
         children = self.children
-        # First dispose children (so they wont send messages back), then clear
-        # the children and dispose ourselves.
+        # Clear the children, so that the children don't have to remove
+        # themselves from our children one by one. Then dispose children (so
+        # they wont send messages back), and dispose ourselves.
+        self._children_value = ()
         for child in children:
             child.dispose()
         super().dispose()
         self.set_parent(None)
-        self._children_value = ()
+        if self.__resize_observer:
+            self.__resize_observer.disconnect()
 
     ## Actions
 
@@ -590,34 +897,49 @@ class Widget(app.JsComponent):
         # the inner and outer node are the same, but not always
         # (e.g. CanvasWidget).
 
-        # Set style elements, keep track in a dict
-        d = {}
-        if style:
+        # Parse the style string. The result is cached, since the same style
+        # is often applied to many widgets.
+        global _style_cache, _style_cache_size
+        if not style:
+            return
+        entry = _style_cache[style]
+        if entry is undefined:
+            pairs = []
+            d = {}
             for part in style.split(';'):
                 if ':' in part:
                     key, val = part.split(':')
                     key, val = key.trim(), val.trim()
-                    self.outernode.style[key] = val
+                    pairs.append((key, val))
                     d[key] = val
+            # Get the size limits (index in mima, value) that the style sets
+            limits = []
+            size_limits_keys = 'min-width', 'max-width', 'min-height', 'max-height'
+            for i in range(4):
+                key = size_limits_keys[i]
+                if key in d:
+                    val = d[key]
+                    if val == '0':
+                        limits.append((i, 0))
+                    elif val.endswith('px'):
+                        limits.append((i, float(val[:-2])))
+            entry = {'pairs': pairs, 'limits': limits}
+            if _style_cache_size >= 1000:  # don't grow forever on dynamic styles
+                _style_cache, _style_cache_size = {}, 0
+            _style_cache[style] = entry
+            _style_cache_size += 1
+
+        # Set style elements
+        for pair in entry.pairs:
+            self.outernode.style[pair[0]] = pair[1]
 
         # Did we change style related to sizing?
-        w1, h1 = self.minsize
-        w2, h2 = self.maxsize
-        mima = w1, w2, h1, h2
-        size_limits_keys = 'min-width', 'max-width', 'min-height', 'max-height'
-        size_limits_changed = False
-        for i in range(4):
-            key = size_limits_keys[i]
-            if key in d:
-                val = d[key]
-                if val == '0':
-                    mima[i] = 0
-                    size_limits_changed = True
-                elif val.endswith('px'):
-                    mima[i] = float(val[:-2])
-                    size_limits_changed = True
-
-        if size_limits_changed:
+        if len(entry.limits) > 0:
+            w1, h1 = self.minsize
+            w2, h2 = self.maxsize
+            mima = w1, w2, h1, h2
+            for limit in entry.limits:
+                mima[limit[0]] = limit[1]
             self.set_minsize((mima[0], mima[2]))
             self.set_maxsize((mima[1], mima[3]))
 
@@ -637,21 +959,33 @@ class Widget(app.JsComponent):
     @event.reaction('title')
     def __title_changed(self, *events):
         if self.parent is None and self.container == 'body':
-            window.document.title = self.title or 'Flexx app'
+            self._update_document_title()
 
     @event.reaction('icon')
     def __icon_changed(self, *events):
         if self.parent is None and self.container == 'body':
-            window.document.title = self.title or 'Flexx app'
-
-            link = window.document.createElement('link')
-            oldLink = window.document.getElementById('flexx-favicon')
+            self._update_document_title()
+
+            icon = events[-1].new_value
+            if icon == self.__applied_icon:
+                return
+            document = window.document
+            link = document.createElement('link')
+            oldLink = document.getElementById('flexx-favicon')
             link.id = 'flexx-favicon'
             link.rel = 'shortcut icon'
-            link.href = events[-1].new_value
+            link.href = icon
             if oldLink:
-                window.document.head.removeChild(oldLink)
-            window.document.head.appendChild(link)
+                document.head.removeChild(oldLink)
+            document.head.appendChild(link)
+            self.__applied_icon = icon
+
+    def _update_document_title(self):
+        """ Set the document title from this widget's title (if it differs).
+        """
+        title = self.title or 'Flexx app'
+        if window.document.title != title:
+            window.document.title = title
 
     @event.reaction
     def __update_tabindex(self, *events):
@@ -697,18 +1031,20 @@ class Widget(app.JsComponent):
         """ Update the internal _size_limits.
         Note that this is an implicit reaction.
         """
-        # Get new limits
+        # Get new limits. Note that the event loop calls this (like any
+        # reaction) once per iteration, even if many children have changed.
         w1, w2, h1, h2 = self._query_min_max_size()
         w1 = max(0, w1)
         h1 = max(0, h1)
         # Update the property, so that our parent may react
         self._set_size_limits((w1, w2, h1, h2))
-        # Update the style, so that flexbox works
+        # Update the style, so that flexbox works. Only touch what changed.
         s = self.outernode.style
-        s['min-width'] = w1 + 'px'
-        s['max-width'] = w2 + 'px'
-        s['min-height'] = h1 + 'px'
-        s['max-height'] = h2 + 'px'
+        names = 'min-width', 'max-width', 'min-height', 'max-height'
+        values = w1 + 'px', w2 + 'px', h1 + 'px', h2 + 'px'
+        for i in range(4):
+            if s[names[i]] != values[i]:
+                s[names[i]] = values[i]
 
     def _query_min_max_size(self):
         """Can be overloaded in subclasses to include the minsize and maxsize of
@@ -735,11 +1071,53 @@ class Widget(app.JsComponent):
         be necessary to invoke this action, since a widget does so by itself,
         but it some situations the widget may not be aware of possible size
         changes.
+
+        The size is measured in the next animation frame, together with that
+        of other widgets, so that the browser only has to do the layout once.
         """
-        n = self.outernode
+        if self._size_check_queued is True:
+            return
+        queue = self._size_check_queue
+        if len(queue) == 0:
+            window.requestAnimationFrame(self.__check_queued_sizes)
+        queue.push(self)
+        self._size_check_queued = True
+
+    def __check_queued_sizes(self):
+        # Read the sizes of all queued widgets first, and then apply them,
+        # so that there are no DOM reads in between updates. A new size makes
+        # the child widgets check their size, so we let the event loop process
+        # the new sizes, and handle the widgets that it queues in this same
+        # frame, rather than in one frame per level of nesting.
+        queue = self._size_check_queue
+        i0 = 0
+        for depth in range(32):  # limit, in case sizes keep changing
+            widgets = queue.slice(i0)
+            if len(widgets) == 0:
+                break
+            i0 = len(queue)
+            sizes = []
+            for widget in widgets:
+                widget._size_check_queued = False
+                n = widget.outernode
+                sizes.push([n.clientWidth, n.clientHeight])
+            for i in range(len(widgets)):
+                if widgets[i]._disposed is False:
+                    widgets[i]._set_real_size(sizes[i])
+            # Apply the sizes and run the reactions, then invoke the
+            # check_real_size() actions that these reactions invoked.
+            loop.iter()
+            loop.iter()
+        # Widgets that are still in the queue are checked in the next frame
+        queue.splice(0, i0)
+        if len(queue) > 0:
+            window.requestAnimationFrame(self.__check_queued_sizes)
+
+    @event.action
+    def _set_real_size(self, size):
         cursize = self.size
-        if cursize[0] != n.clientWidth or cursize[1] != n.clientHeight:
-            self._mutate_size([n.clientWidth, n.clientHeight])
+        if cursize[0] != size[0] or cursize[1] != size[1]:
+            self._mutate_size(size)
 
     @event.reaction('container', 'parent.size', 'children')
     def __size_may_have_changed(self, *events):
@@ -752,14 +1130,18 @@ class Widget(app.JsComponent):
         """
         size = w, h
         for i in range(2):
-            if size[i] <= 0 or size is None or size is undefined:
+            if size[i] is None or size[i] is undefined or size[i] <= 0:
                 size[i] = ''  # Use size defined by CSS
             elif size[i] > 1:
                 size[i] = size[i] + 'px'
             else:
                 size[i] = size[i] * 100 + '%'
-        self.outernode.style[prefix + 'width'] = size[0]
-        self.outernode.style[prefix + 'height'] = size[1]
+        # Only touch the style if the values have changed
+        style = self.outernode.style
+        if style[prefix + 'width'] != size[0]:
+            style[prefix + 'width'] = size[0]
+        if style[prefix + 'height'] != size[1]:
+            style[prefix + 'height'] = size[1]
 
     ## Parenting
 
@@ -780,34 +1162,38 @@ class Widget(app.JsComponent):
         # Apply parent
         self._mutate_parent(new_parent)
 
-        # Remove ourselves
+        # Remove ourselves (we may already be removed, e.g. on dispose)
         if old_parent is not None:
-            children = []
-            for i in range(len(old_parent.children)):
-                child = old_parent.children[i]
-                if child is not self:
-                    children.push(child)
-            if old_parent is not new_parent:
-                old_parent._mutate_children(children)
+            children = old_parent.children.slice()
+            i = children.indexOf(self)
+            if i >= 0:
+                children.splice(i, 1)
+                if old_parent is not new_parent:
+                    old_parent._mutate_children(children)
 
         # Insert ourselves
         if new_parent is not None:
             if old_parent is not new_parent:
-                children = []
-                for i in range(len(new_parent.children)):
-                    child = new_parent.children[i]
-                    if child is not self:
-                        children.push(child)
+                children = new_parent.children.slice()
+                i = children.indexOf(self)
+                if i >= 0:
+                    children.splice(i, 1)
             if pos is None:
                 children.push(self)
             elif pos >= 0:
-                children.insert(pos, self)
-            elif pos < 0:
-                children.append(None)
-                children.insert(pos, self)
-                children.pop(-1)
+                children.splice(pos, 0, self)
+            elif pos < 0:  # i.e. -1 means last
+                children.splice(max(0, len(children) + pos + 1), 0, self)
             else:  # maybe pos is nan for some reason
                 children.push(self)
+            # Only mutate if the order of the children has actually changed
+            old_children = new_parent.children
+            if len(children) == len(old_children):
+                for i in range(len(children)):
+                    if children[i] is not old_children[i]:
+                        break
+                else:
+                    return
             new_parent._mutate_children(children)
 
     @event.reaction('container')
@@ -817,15 +1203,24 @@ class Widget(app.JsComponent):
         if self.parent:
             return
 
-        # Let session keep us up to date about size changes
-        # (or make it stop if we dont have a container anymore)
-        self._session.keep_checking_size_of(self, bool(id))
+        # Keep up to date about size changes (or stop if we dont have a
+        # container anymore). Let the browser notify us if it can, otherwise
+        # let the session check our size periodically.
+        if window.ResizeObserver:
+            if self.__resize_observer is undefined:
+                self.__resize_observer = window.ResizeObserver(self.__resized)
+            if id:
+                self.__resize_observer.observe(self.outernode)
+            else:
+                self.__resize_observer.unobserve(self.outernode)
+        else:
+            self._session.keep_checking_size_of(self, bool(id))
 
         if id:
             if id == 'body':
                 el = window.document.body
                 self.outernode.classList.add('flx-main-widget')
-                window.document.title = self.title or 'Flexx app'
+                self._update_document_title()
             else:
                 el = window.document.getElementById(id)
                 if el is None:  # Try again later
@@ -833,6 +1228,10 @@ class Widget(app.JsComponent):
                     return
             el.appendChild(self.outernode)
 
+    def __resized(self, entries):
+        if self._disposed is False:
+            self.check_real_size()
+
     def _release_child(self, widget):
         """ Overload to restore a child widget, e.g. to its normal style.
         """
@@ -848,25 +1247,26 @@ class Widget(app.JsComponent):
             for event_type in event_types:
                 if event_type in ('key_down', 'key_up', 'key_press'):
                     self.set_tabindex(-1)
+        # Move events are frequent, so only create them when they are used
+        self.__move_used_here = 'pointer_move' in event_types
+        self.__up_used_here = 'pointer_up' in event_types
         return event_types
 
+    def _flx_set_event_types_at_proxy(self, event_types):
+        super()._flx_set_event_types_at_proxy(event_types)
+        self.__move_used_at_proxy = 'pointer_move' in event_types
+        self.__up_used_at_proxy = 'pointer_up' in event_types
+
     def _init_events(self):
-        # TODO: we listen to a lot of events which is unncessary in a lot of cases.
-        # Maybe make it possible (with a class attribute?) to configure this
-        # Connect some standard events
-        self._addEventListener(self.node, 'wheel', self.pointer_wheel, 0)
-        self._addEventListener(self.node, 'keydown', self.key_down, 0)
-        self._addEventListener(self.node, 'keyup', self.key_up, 0)
-        self._addEventListener(self.node, 'keypress', self.key_press, 0)
-        # Mouse events, for move and up we implement some heuristics below
-        self._addEventListener(self.node, 'mousedown', self.pointer_down, 0)
-        self._addEventListener(self.node, 'click', self.pointer_click, 0)
-        self._addEventListener(self.node, 'dblclick', self.pointer_double_click, 0)
-        # Touch events
-        self._addEventListener(self.node, 'touchstart', self.pointer_down, 0)
-        self._addEventListener(self.node, 'touchmove', self.pointer_move, 0)
-        self._addEventListener(self.node, 'touchend', self.pointer_up, 0)
-        self._addEventListener(self.node, 'touchcancel', self.pointer_cancel, 0)
+        # The DOM events are handled via event delegation (see
+        # _dispatch_event()), so we only need to make this widget findable
+        # from its node, and make sure that the document listeners are set.
+        # Note that this means that a listener on a node that calls
+        # e.stopPropagation() also stops the emitters of its widget (and
+        # the widgets around it), even if it is on the widget's own node.
+        # Such listeners should emit the event themselves (e.g.
+        # ComboBox._key_down and TreeItem._on_click). See the class docstring.
+        self.node.__flx_widget = self
 
         # Implement mouse capturing. When a mouse is pressed down on
         # a widget, it "captures" the mouse, and will continue to receive
@@ -874,66 +1274,98 @@ class Widget(app.JsComponent):
 
         self._capture_flag = 0
         # 0: mouse not down, 1: mouse down (no capture), 2: captured, -1: capture end
-
-        def mdown(e):
-            # Start emitting move events, maybe follow the mouse outside widget bounds
-            if self.capture_mouse == 0:
-                self._capture_flag = 1
+        self._drag_rect = None  # bounding rect of the node during capture
+
+        # Move and wheel events are emitted once per animation frame
+        self.__pending_move = None
+        self.__pending_wheel = None
+
+        # The wheel and touch listeners on the document are passive, so that
+        # the browser does not have to wait for them to scroll. Widgets that
+        # need to prevent the default behavior get their own (non-passive)
+        # listeners, which dispatch the event right away.
+        if not self._wheel_passive:
+            self._addEventListener(self.node, 'wheel', _dispatch_event,
+                                   {'passive': False})
+        if not self._touch_passive:
+            for type in ('touchstart', 'touchmove'):
+                self._addEventListener(self.node, type, _dispatch_event,
+                                       {'passive': False})
+
+        if window.flexx._widget_events_delegated:
+            return
+        window.flexx._widget_events_delegated = True
+
+        doc = window.document
+        for type in _DELEGATED_EVENTS.keys():
+            if type == 'losecapture':
+                # IE only, and it does not bubble
+                doc.addEventListener(type, _dispatch_event, True)
+            elif type in ('wheel', 'touchstart', 'touchmove',
+                          'mousemove', 'mouseup'):
+                # Passive, so the browser does not have to wait for these (see
+                # _wheel_passive and _touch_passive)
+                doc.addEventListener(type, _dispatch_event, {'passive': True})
             else:
-                self._capture_flag = 2
-                window.document.addEventListener("mousemove", mmove_outside, True)
-                window.document.addEventListener("mouseup", mup_outside, True)
-                # Explicit caputuring is not necessary, and even causes problems on IE
-                #if self.node.setCapture:
-                #    self.node.setCapture()
-
-        def mmove_inside(e):
-            # maybe emit move event
-            if self._capture_flag == -1:
-                self._capture_flag = 0
-            elif self._capture_flag == 1:
-                self.pointer_move(e)
-            elif self._capture_flag == 0 and self.capture_mouse > 1:
-                self.pointer_move(e)
-
-        def mup_inside(e):
-            if self._capture_flag == 1:
-                self.pointer_up(e)
+                doc.addEventListener(type, _dispatch_event, False)
+        # Setup capturing and releasing. These listeners are not passive, because
+        # the emitters of capturing widgets may prevent the default (e.g. HVLayout).
+        for type in ('mousedown', 'mousemove', 'mouseup'):
+            doc.addEventListener(type, _on_mouse_capture_phase, True)
+        window.addEventListener('resize', _clear_drag_rects, False)
+        window.addEventListener('scroll', _clear_drag_rects, True)  # any element
+
+    def _on_mdown(self, e):
+        # Start emitting move events, maybe follow the mouse outside widget bounds
+        if self.capture_mouse == 0 or not self.__needs_capture():
+            self._capture_flag = 1
+        else:
+            self._capture_flag = 2
+            if _capturing_widgets.indexOf(self) < 0:
+                _capturing_widgets.push(self)
+            # Explicit caputuring is not necessary, and even causes problems on IE
+            #if self.node.setCapture:
+            #    self.node.setCapture()
+
+    def __needs_capture(self):
+        # Capturing is only useful if the move or up events are used, either
+        # by reactions (here or at the proxy), or by an overloaded emitter.
+        cls = self.__class__
+        if (cls.pointer_move is not Widget.prototype.pointer_move or
+                cls.pointer_up is not Widget.prototype.pointer_up):
+            return True
+        return (self.__move_used_here is True or self.__move_used_at_proxy is True or
+                self.__up_used_here is True or self.__up_used_at_proxy is True)
+
+    def _on_mmove_inside(self, e):
+        # maybe emit move event
+        if self._capture_flag == -1:
             self._capture_flag = 0
+        elif self._capture_flag == 1:
+            self._on_move(e)
+        elif self._capture_flag == 0 and self.capture_mouse > 1:
+            self._on_move(e)
+
+    def _on_mup_inside(self, e):
+        if self._capture_flag == 1:
+            self.pointer_up(e)
+        self._capture_flag = 0
 
-        def mmove_outside(e):
-            # emit move event
-            if self._capture_flag == 2:  # can hardly be anything else, but be safe
-                e = window.event if window.event else e
-                self.pointer_move(e)
-
-        def mup_outside(e):
-            # emit mouse up event, and stop capturing
-            if self._capture_flag == 2:
-                e = window.event if window.event else e
-                stopcapture()
-                self.pointer_up(e)
-
-        def stopcapture():
-            # Stop capturing
-            if self._capture_flag == 2:
-                self._capture_flag = -1
-                window.document.removeEventListener("mousemove", mmove_outside, True)
-                window.document.removeEventListener("mouseup", mup_outside, True)
-
-        def losecapture(e):
-            # We lost the capture. The losecapture event seems to be IE only.
-            # The pointer_cancel seems poort supported too. So pointer_cancel
-            # only really works with touch events ...
-            stopcapture()
-            self.pointer_cancel(e)
-
-        # Setup capturing and releasing
-        self._addEventListener(self.node, 'mousedown', mdown, True)
-        self._addEventListener(self.node, "losecapture", losecapture)
-        # Subscribe to normal mouse events
-        self._addEventListener(self.node, "mousemove", mmove_inside, False)
-        self._addEventListener(self.node, "mouseup", mup_inside, False)
+    def _stop_capture(self):
+        # Stop capturing
+        if self._capture_flag == 2:
+            self._capture_flag = -1
+            self._drag_rect = None
+            i = _capturing_widgets.indexOf(self)
+            if i >= 0:
+                _capturing_widgets.splice(i, 1)
+
+    def _on_losecapture(self, e):
+        # We lost the capture. The losecapture event seems to be IE only.
+        # The pointer_cancel seems poort supported too. So pointer_cancel
+        # only really works with touch events ...
+        self._stop_capture()
+        self.pointer_cancel(e)
 
     @event.emitter
     def pointer_down(self, e):
@@ -957,6 +1389,7 @@ class Widget(app.JsComponent):
         both as its own "pointer event". In effect, it works better on mobile
         devices, and has multi-touch support.
         """
+        self._emit_pending_move()
         return self._create_pointer_event(e)
 
     @event.emitter
@@ -965,6 +1398,7 @@ class Widget(app.JsComponent):
 
         See pointer_down() for a description of the event object.
         """
+        self._emit_pending_move()
         return self._create_pointer_event(e)
 
     @event.emitter
@@ -975,6 +1409,7 @@ class Widget(app.JsComponent):
 
         See pointer_down() for a description of the event object.
         """
+        self._emit_pending_move()
         return self._create_pointer_event(e)
 
     @event.emitter
@@ -997,13 +1432,32 @@ class Widget(app.JsComponent):
     def pointer_move(self, e):
         """ Event fired when the mouse or a touch is moved.
 
-        See pointer_down for details.
+        See pointer_down for details. Unless this emitter is overloaded,
+        this event is emitted at most once per animation frame, for the most
+        recent move.
         """
-
         ev = self._create_pointer_event(e)
         ev.button = 0
         return ev
 
+    def _on_move(self, e):
+        # Called for each move DOM event. An overloaded emitter gets each
+        # event right away, since it may want to e.g. prevent its default.
+        # Otherwise we emit the most recent move in the next animation frame.
+        if self.__class__.pointer_move is not Widget.prototype.pointer_move:
+            self.pointer_move(e)
+        elif self.__move_used_here is True or self.__move_used_at_proxy is True:
+            if self.__pending_move is None:
+                self.__queue_pointer_events()
+            self.__pending_move = e
+
+    def _emit_pending_move(self):
+        e = self.__pending_move
+        if e is not None:
+            self.__pending_move = None
+            if self._disposed is False:
+                self.pointer_move(e)
+
     @event.emitter
     def pointer_wheel(self, e):
         """ Event emitted when the mouse wheel is used.
@@ -1013,25 +1467,78 @@ class Widget(app.JsComponent):
 
         * hscroll: amount of scrolling in horizontal direction
         * vscroll: amount of scrolling in vertical direction
+
+        Unless this emitter is overloaded, this event is emitted at most once
+        per animation frame; the scroll amounts of the wheel events in that
+        frame are summed.
         """
         # Note: wheel event gets generated also for parent widgets
         # I think this makes sense, but there might be cases
         # where we want to prevent propagation.
         ev = self._create_pointer_event(e)
         ev.button = 0
-        ev.hscroll = e.deltaX * [1, 16, 600][e.deltaMode]
-        ev.vscroll = e.deltaY * [1, 16, 600][e.deltaMode]
+        ev.hscroll = e.deltaX * _WHEEL_MULT[e.deltaMode]
+        ev.vscroll = e.deltaY * _WHEEL_MULT[e.deltaMode]
         return ev
 
+    def _on_wheel(self, e):
+        # Called for each wheel DOM event, see _on_move()
+        if self.__class__.pointer_wheel is not Widget.prototype.pointer_wheel:
+            self.pointer_wheel(e)
+            return
+        pending = self.__pending_wheel
+        if pending is None:
+            self.__pending_wheel = pending = [e, 0, 0]
+            self.__queue_pointer_events()
+        pending[0] = e
+        pending[1] += e.deltaX * _WHEEL_MULT[e.deltaMode]
+        pending[2] += e.deltaY * _WHEEL_MULT[e.deltaMode]
+
+    def _emit_pending_wheel(self):
+        if self.__pending_wheel is None:
+            return
+        e, hscroll, vscroll = self.__pending_wheel
+        self.__pending_wheel = None
+        if self._disposed is False:
+            ev = self._create_pointer_event(e)
+            ev.button = 0
+            ev.hscroll = hscroll
+            ev.vscroll = vscroll
+            self.emit('pointer_wheel', ev)
+
+    def __queue_pointer_events(self):
+        # The pending events of all widgets are emitted in one animation frame
+        if self._pointer_queued is True:
+            return
+        queue = self._pointer_queue
+        if len(queue) == 0:
+            window.requestAnimationFrame(self.__emit_queued_pointer_events)
+        queue.push(self)
+        self._pointer_queued = True
+
+    def __emit_queued_pointer_events(self):
+        queue = self._pointer_queue
+        widgets = queue.splice(0, len(queue))
+        for widget in widgets:
+            widget._pointer_queued = False
+            widget._emit_pending_move()
+            widget._emit_pending_wheel()
+
     def _create_pointer_event(self, e):
-        # Get offset to fix positions
-        rect = self.node.getBoundingClientRect()
-        offset = rect.left, rect.top
+        # Get offset to fix positions. While the mouse is captured, we reuse
+        # the rect, so that moves do not each force a layout.
+        rect = self._drag_rect
+        if rect is None:
+            rect = self.node.getBoundingClientRect()
+            if self._capture_flag == 2:
+                self._drag_rect = rect
+        left = rect.left
+        top = rect.top
 
         if e.type.startswith('touch'):
             # Touch event - select one touch to represent the main position
             t = e.changedTouches[0]
-            pos = float(t.clientX - offset[0]), float(t.clientY - offset[1])
+            pos = float(t.clientX - left), float(t.clientY - top)
             page_pos = t.pageX, t.pageY
             button = 0
             buttons = []
@@ -1041,29 +1548,30 @@ class Widget(app.JsComponent):
                 t = e.changedTouches[i]
                 if t.target is not e.target:
                     continue
-                touches[t.identifier] = (float(t.clientX - offset[0]),
-                                         float(t.clientY - offset[1]),
+                touches[t.identifier] = (float(t.clientX - left),
+                                         float(t.clientY - top),
                                          t.force)
         else:
             # Mouse event
-            pos = float(e.clientX - offset[0]), float(e.clientY - offset[1])
+            x = float(e.clientX - left)
+            y = float(e.clientY - top)
+            pos = x, y
             page_pos = e.pageX, e.pageY
+            button = _BUTTON_MAP[e.button]
             # Fix buttons
-            if e.buttons:
-                buttons_mask = RawJS(
-                    "e.buttons.toString(2).split('').reverse().join('')"
-                )
-            else:
+            buttons_mask = e.buttons
+            if buttons_mask is undefined:
                 # libjavascriptcoregtk-3.0-0  version 2.4.11-1 does not define
                 # e.buttons
-                buttons_mask = [e.button.toString(2)]
-            buttons = [i+1 for i in range(5) if buttons_mask[i] == '1']
-            button = {0: 1, 1: 3, 2: 2, 3: 4, 4: 5}[e.button]
-            touches = {-1: (pos[0], pos[1], 1)}  # key must not clash with real touches
+                buttons_mask = _BUTTON_TO_MASK[e.button]
+            buttons = []
+            for i in range(5):  # a plain loop, a comprehension creates a range
+                if buttons_mask & (1 << i):
+                    buttons.push(i + 1)
+            touches = {-1: (x, y, 1)}  # key must not clash with real touches
 
         # note: our button has a value as in JS "which"
-        modifiers = [n for n in ('Alt', 'Shift', 'Ctrl', 'Meta')
-                        if e[n.toLowerCase() + 'Key']]
+        modifiers = _get_modifiers(e).slice()
         # Create event dict
         return dict(pos=pos, page_pos=page_pos, touches=touches,
                     button=button, buttons=buttons,
@@ -1117,8 +1625,7 @@ class Widget(app.JsComponent):
         # https://developer.mozilla.org/en-US/docs/Web/API/KeyboardEvent
         # key: chrome 51, ff 23, ie 9
         # code: chrome ok, ff 32, ie no
-        modifiers = [n for n in ('Alt', 'Shift', 'Ctrl', 'Meta')
-                        if e[n.toLowerCase() + 'Key']]
+        modifiers = _get_modifiers(e).slice()
         key = e.key
         if not key and e.code:  # Chrome < v51
             key = e.code
@@ -1129,7 +1636,7 @@ class Widget(app.JsComponent):
             elif key.startswith('Digit'):
                 key = key[5:]
         # todo: handle Safari and older browsers via keyCode
-        key = {'Esc': 'Escape', 'Del': 'Delete'}.get(key, key)  # IE
+        key = _KEY_REMAP.get(key, key)
         return dict(key=key, modifiers=modifiers)
 
 
@@ -98,6 +98,7 @@ More reading:
 from ... import event, app
 from ...event import Property
 from . import Layout
+from .._widget import _dispatch_event
 
 
 class OrientationProp(Property):
@@ -538,6 +539,10 @@ class HVLayout(Layout):
             self._seps.append(sep)
             sep.i = len(self._seps) - 1
             sep.classList.add('flx-split-sep')
+            # Touch events target the node where the touch started, so this
+            # lets pointer_move() prevent the default while dragging a splitter
+            self._addEventListener(sep, 'touchmove', _dispatch_event,
+                                   {'passive': False})
             # sep.classList.add(hv)
             sep.rel_pos = 0
             sep.abs_pos = 0
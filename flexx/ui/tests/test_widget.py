@@ -0,0 +1,619 @@
+"""
+Test the JS side of the Widget class (rendering, events) in Node.js.
+
+The app is exported to a static html document, and its scripts are run
+in a minimal fake DOM (defined below), which implements just enough of
+the browser API for a Flexx app to run. The test code is the body of an
+async JS function, in which ``app`` is the root widget.
+"""
+
+import os
+import re
+import json
+import tempfile
+import subprocess
+
+from pscript.functions import get_node_exe
+
+from flexx import flx
+
+from flexx.util.testing import run_tests_if_main
+
+
+FAKE_DOM = """
+var vm = require('vm');
+
+function Event(type, init) {
+    var defaults = {clientX: 0, clientY: 0, pageX: 0, pageY: 0, button: 0,
+                    buttons: 0, altKey: false, shiftKey: false, ctrlKey: false,
+                    metaKey: false, key: '', code: '', deltaX: 0, deltaY: 0,
+                    deltaMode: 0, target: null};
+    Object.assign(this, defaults, init || {});
+    this.type = type;
+    this.defaultPrevented = false;
+    this.cancelBubble = false;
+}
+Event.prototype.preventDefault = function () {
+    if (!this._passive) { this.defaultPrevented = true; }
+};
+Event.prototype.stopPropagation = function () { this.cancelBubble = true; };
+
+function EventTarget() { this._listeners = []; }
+EventTarget.prototype.addEventListener = function (type, cb, opts) {
+    var capture = (opts && typeof opts === 'object') ? !!opts.capture : !!opts;
+    var passive = (opts && typeof opts === 'object') ? !!opts.passive : false;
+    this._listeners.push({type: type, cb: cb, capture: capture, passive: passive});
+};
+EventTarget.prototype.removeEventListener = function (type, cb, opts) {
+    var capture = (opts && typeof opts === 'object') ? !!opts.capture : !!opts;
+    this._listeners = this._listeners.filter(function (l) {
+        return !(l.type === type && l.cb === cb && l.capture === capture);
+    });
+};
+EventTarget.prototype._fire = function (e, phase) {
+    var listeners = this._listeners.slice();
+    for (var i = 0; i < listeners.length; i++) {
+        var l = listeners[i];
+        if (l.type !== e.type) { continue; }
+        if ((phase === 1 && !l.capture) || (phase === 3 && l.capture)) { continue; }
+        e.currentTarget = this;
+        e._passive = l.passive;
+        l.cb.call(this, e);
+        e._passive = false;
+    }
+    if (phase === 2 && typeof this['on' + e.type] === 'function') {
+        this['on' + e.type](e);
+    }
+};
+EventTarget.prototype.dispatchEvent = function (e) {
+    e.target = e.target || this;
+    var path = [];
+    for (var n = this.parentNode; n; n = n.parentNode) { path.push(n); }
+    path.push(window);
+    for (var i = path.length - 1; i >= 0; i--) {
+        path[i]._fire(e, 1);
+        if (e.cancelBubble) { return !e.defaultPrevented; }
+    }
+    this._fire(e, 2);
+    for (var i = 0; i < path.length && !e.cancelBubble; i++) { path[i]._fire(e, 3); }
+    return !e.defaultPrevented;
+};
+
+function Node() {
+    EventTarget.call(this);
+    this.childNodes = [];
+    this.parentNode = null;
+}
+Node.prototype = Object.create(EventTarget.prototype);
+Object.defineProperty(Node.prototype, 'firstChild', {get: function () {
+    return this.childNodes[0] || null; }});
+Object.defineProperty(Node.prototype, 'lastChild', {get: function () {
+    return this.childNodes[this.childNodes.length - 1] || null; }});
+Object.defineProperty(Node.prototype, 'children', {get: function () {
+    return this.childNodes.filter(function (n) { return n.nodeType === 1; }); }});
+Object.defineProperty(Node.prototype, 'textContent', {
+    get: function () {
+        return this.childNodes.map(function (n) { return n.textContent; }).join(''); },
+    set: function (v) {
+        while (this.childNodes.length) { this.removeChild(this.lastChild); }
+        if (v) { this.appendChild(new Text(v)); }
+    }});
+Node.prototype.insertBefore = function (n, ref) {
+    if (n.parentNode) { n.parentNode.removeChild(n); }
+    var i = ref ? this.childNodes.indexOf(ref) : -1;
+    if (ref && i < 0) { throw new Error('insertBefore: ref is not a child'); }
+    if (i < 0) { this.childNodes.push(n); } else { this.childNodes.splice(i, 0, n); }
+    n.parentNode = this;
+    return n;
+};
+Node.prototype.appendChild = function (n) { return this.insertBefore(n, null); };
+Node.prototype.removeChild = function (n) {
+    var i = this.childNodes.indexOf(n);
+    if (i < 0) { throw new Error('removeChild: not a child'); }
+    this.childNodes.splice(i, 1);
+    n.parentNode = null;
+    return n;
+};
+Node.prototype.replaceChild = function (n, old) {
+    this.insertBefore(n, old);
+    return this.removeChild(old);
+};
+Node.prototype.contains = function (n) {
+    for (; n; n = n.parentNode) { if (n === this) { return true; } }
+    return false;
+};
+
+function Text(data) {
+    Node.call(this);
+    this.nodeType = 3;
+    this.nodeName = '#text';
+    this.data = String(data);
+}
+Text.prototype = Object.create(Node.prototype);
+Object.defineProperty(Text.prototype, 'textContent', {
+    get: function () { return this.data; },
+    set: function (v) { this.data = String(v); }});
+Text.prototype.cloneNode = function () { return new Text(this.data); };
+
+function ClassList(el) { this.el = el; }
+ClassList.prototype._list = function () {
+    return this.el.className.split(' ').filter(function (c) { return c; }); };
+ClassList.prototype.contains = function (c) { return this._list().indexOf(c) >= 0; };
+ClassList.prototype.add = function () {
+    var list = this._list();
+    for (var i = 0; i < arguments.length; i++) {
+        if (list.indexOf(arguments[i]) < 0) { list.push(arguments[i]); }
+    }
+    this.el.className = list.join(' ');
+};
+ClassList.prototype.remove = function () {
+    var remove = Array.prototype.slice.call(arguments);
+    this.el.className = this._list().filter(function (c) {
+        return remove.indexOf(c) < 0; }).join(' ');
+};
+ClassList.prototype.toggle = function (c, force) {
+    if (force === undefined) { force = !this.contains(c); }
+    if (force) { this.add(c); } else { this.remove(c); }
+    return force;
+};
+
+function Style() {}
+Style.prototype.setProperty = function (k, v) { this[k] = String(v); };
+Style.prototype.getPropertyValue = function (k) { return this[k] || ''; };
+Style.prototype.removeProperty = function (k) { delete this[k]; };
+
+function Element(tag) {
+    Node.call(this);
+    this.nodeType = 1;
+    this.nodeName = this.tagName = tag.toUpperCase();
+    this.className = '';
+    this.classList = new ClassList(this);
+    this.style = new Style();
+    this.attributes = {};
+    this.id = '';
+    this._width = this._height = 100;  // the size for the layout reads
+}
+Element.prototype = Object.create(Node.prototype);
+Object.defineProperty(Element.prototype, 'tabIndex', {
+    get: function () {
+        return 'tabindex' in this.attributes ? Number(this.attributes.tabindex) : -1; },
+    set: function (v) { this.attributes.tabindex = String(Number(v) || 0); }});
+Element.prototype.setAttribute = function (k, v) { this.attributes[k.toLowerCase()] = String(v); };
+Element.prototype.getAttribute = function (k) {
+    k = k.toLowerCase();
+    return k in this.attributes ? this.attributes[k] : null;
+};
+Element.prototype.hasAttribute = function (k) { return k.toLowerCase() in this.attributes; };
+Element.prototype.removeAttribute = function (k) { delete this.attributes[k.toLowerCase()]; };
+Element.prototype.getBoundingClientRect = function () {
+    return {left: 0, top: 0, right: 100, bottom: 100, width: 100, height: 100}; };
+Element.prototype.cloneNode = function (deep) {
+    var n = new Element(this.nodeName);
+    n.className = this.className;
+    if (deep) {
+        for (var i = 0; i < this.childNodes.length; i++) {
+            n.appendChild(this.childNodes[i].cloneNode(true));
+        }
+    }
+    return n;
+};
+Element.prototype.querySelectorAll = function (sel) {
+    var result = [];
+    var walk = function (n) {
+        for (var i = 0; i < n.children.length; i++) {
+            var c = n.children[i];
+            if (sel[0] === '.' ? c.classList.contains(sel.slice(1)) :
+                                 c.nodeName === sel.toUpperCase()) { result.push(c); }
+            walk(c);
+        }
+    };
+    walk(this);
+    return result;
+};
+Element.prototype.querySelector = function (sel) {
+    return this.querySelectorAll(sel)[0] || null; };
+Element.prototype.getElementsByTagName = Element.prototype.querySelectorAll;
+Element.prototype.focus = function () { document.activeElement = this; };
+Element.prototype.blur = function () { document.activeElement = document.body; };
+['clientWidth', 'offsetWidth'].forEach(function (k) {
+    Object.defineProperty(Element.prototype, k, {get: function () { return this._width; }});
+});
+['clientHeight', 'offsetHeight'].forEach(function (k) {
+    Object.defineProperty(Element.prototype, k, {get: function () { return this._height; }});
+});
+
+function Document() {
+    Node.call(this);
+    this.nodeType = 9;
+    this.nodeName = '#document';
+    this.documentElement = this.appendChild(new Element('html'));
+    this.head = this.documentElement.appendChild(new Element('head'));
+    this.body = this.documentElement.appendChild(new Element('body'));
+    this.activeElement = this.body;
+    this.title = '';
+}
+Document.prototype = Object.create(Node.prototype);
+Document.prototype.createElement = function (tag) { return new Element(tag); };
+Document.prototype.createTextNode = function (data) { return new Text(data); };
+Document.prototype.getElementById = function (id) {
+    var nodes = this.documentElement.querySelectorAll('*');
+    return nodes.filter(function (n) { return n.id === id; })[0] || null;
+};
+Document.prototype.querySelectorAll = function (sel) {
+    return this.documentElement.querySelectorAll(sel); };
+Document.prototype.querySelector = function (sel) {
+    return this.documentElement.querySelector(sel); };
+Document.prototype.getElementsByTagName = function (tag) {
+    return this.documentElement.querySelectorAll(tag); };
+
+var window = new EventTarget();
+var document = new Document();
+var animationFrames = [];
+Object.assign(window, {
+    window: window, self: window, document: document, console: console,
+    setTimeout: setTimeout, clearTimeout: clearTimeout,
+    setInterval: function () { return 0; }, clearInterval: function () {},
+    location: {protocol: 'file:', hostname: '', port: '', href: 'file:///test.html',
+               search: '', hash: ''},
+    navigator: {userAgent: 'node'},
+    performance: {now: function () { return Date.now(); }, navigation: {type: 0}},
+    Event: Event, Node: Node, Element: Element, HTMLElement: Element,
+    getComputedStyle: function (el) { return el.style; },
+    requestAnimationFrame: function (cb) { return animationFrames.push(cb); },
+    cancelAnimationFrame: function () {},
+    ResizeObserver: function () {
+        this.observe = this.unobserve = this.disconnect = function () {}; },
+    WebSocket: function () { throw new Error('No websockets here'); }
+});
+vm.createContext(window);
+"""
+
+
+RUNNER = """
+for (var i = 0; i < scripts.length; i++) {
+    vm.runInContext(scripts[i], window);
+}
+window._fire(new Event('load'), 3);
+
+function sleep() {
+    return new Promise(function (resolve) { setTimeout(resolve, 1); });
+}
+function flush_frames() {
+    var frames = animationFrames;
+    animationFrames = [];
+    for (var i = 0; i < frames.length; i++) { frames[i](Date.now()); }
+}
+async function settle() {
+    // Let the event loop run (reactions), and run the animation frames
+    for (var i = 0; i < 4; i++) {
+        await sleep();
+        flush_frames();
+    }
+}
+function log() {
+    var args = Array.prototype.slice.call(arguments);
+    console.log(args.map(function (x) { return JSON.stringify(x); }).join(' '));
+}
+
+(async function () {
+    await settle();
+    var app = null;
+    for (var key in window.flexx) {
+        if (window.flexx[key] && window.flexx[key].app) { app = window.flexx[key].app; }
+    }
+    try {
+%s
+    } catch (err) {
+        console.log('ERROR ' + err.stack);
+    }
+    process.exit(0);  // don't wait for pending timers
+})();
+"""
+
+
+def run_in_dom(cls, test_code):
+    """ Export an app for the given widget class, and run the given JS
+    code for it in Node.js. Returns the output lines.
+    """
+    assets = flx.App(cls).dump('test.html', link=0)
+    html = assets['test.html'].decode()
+    scripts = re.findall(r'<script[^>]*>([\s\S]*?)</script>', html)
+    code = FAKE_DOM
+    code += 'var scripts = %s;\n' % json.dumps(scripts)
+    code += RUNNER % test_code
+    # Not using pscript's evaljs(), because the exported app is not strict
+    filename = os.path.join(tempfile.gettempdir(), 'flexx_test_widget.js')
+    with open(filename, 'wb') as f:
+        f.write(code.encode())
+    try:
+        res = subprocess.check_output([get_node_exe(), filename],
+                                      stderr=subprocess.STDOUT)
+    finally:
+        os.remove(filename)
+    return [line for line in res.decode().splitlines()
+            if not line.startswith('Flexx')]  # skip Flexx' own logging
+
+
+def setup_module():
+    flx.manager._clear_old_pending_sessions(1)
+
+
+def teardown_module():
+    flx.manager._clear_old_pending_sessions(1)
+
+
+## Rendering
+
+
+class RenderTester(flx.Widget):
+
+    count = flx.IntProp(0, settable=True)
+    reuse = flx.BoolProp(False, settable=True)
+
+    def init(self):
+        self.vnode = None
+
+    def _render_dom(self):
+        count = self.count
+        if self.reuse and self.vnode is not None:
+            return self.vnode  # same vnode object as last time
+        self.vnode = flx.create_element('div', {'title': 'count ' + count},
+                                        flx.create_element('b', {}, str(count)))
+        return self.vnode
+
+
+def test_render_vnode_identity():
+    lines = run_in_dom(RenderTester, """
+        var b = app.outernode.childNodes[0];
+        log(app.outernode.title, b.textContent);
+        app.set_count(1); await settle();
+        log(app.outernode.title, b.textContent, app.outernode.childNodes[0] === b);
+        // Returning the vnode of the previous render skips the update,
+        // so changes made to it in-place are not applied.
+        app.set_reuse(true); await settle();
+        app.vnode.props.title = 'changed';
+        app.set_count(2); await settle();
+        log(app.outernode.title, b.textContent);
+        // Returning a new vnode updates the DOM again
+        app.set_reuse(false); await settle();
+        log(app.outernode.title, b.textContent);
+    """)
+    assert lines == ['"count 0" "0"',
+                     '"count 1" "1" true',
+                     '"count 1" "1"',
+                     '"count 2" "2"',
+                     ]
+
+
+class PropsTester(flx.Widget):
+
+    mode = flx.IntProp(0, settable=True)
+
+    def _render_dom(self):
+        props = {}
+        if self.mode == 1:
+            props = {'title': 'foo', 'tabIndex': 2, 'style__color': 'red'}
+        elif self.mode == 2:
+            props = {'title': 'bar'}
+        return flx.create_element('div', props, 'x')
+
+
+def test_render_props_add_remove():
+    lines = run_in_dom(PropsTester, """
+        var node = app.outernode;
+        var state = function () {
+            log([node.classList.contains('flx-PropsTester'), node.title || null,
+                 node.tabIndex, node.style.color || null]);
+        };
+        state();
+        app.set_mode(1); await settle(); state();
+        // Props that are no longer given leave the DOM untouched
+        app.set_mode(0); await settle(); state();
+        // Props that are given again are applied again
+        node.title = 'changed';
+        app.set_mode(1); await settle(); state();
+        app.set_mode(2); await settle(); state();
+    """)
+    assert lines == ['[true,null,-1,null]',
+                     '[true,"foo",2,"red"]',
+                     '[true,"foo",2,"red"]',
+                     '[true,"foo",2,"red"]',
+                     '[true,"bar",2,"red"]',
+                     ]
+
+
+
+## Sizing
+
+
+class SizeTester(flx.Widget):
+
+    def init(self):
+        with flx.Widget() as self.w1:
+            with flx.Widget() as self.w2:
+                self.w3 = flx.Widget()
+
+
+def test_size_check_nested():
+    lines = run_in_dom(SizeTester, """
+        var widgets = [app, app.w1, app.w2, app.w3];
+        var sizes = function () {
+            log(widgets.map(function (w) { return w.size[0]; }));
+        };
+        sizes();
+        for (var i = 0; i < widgets.length; i++) { widgets[i].outernode._width = 200; }
+        app.check_real_size();
+        await sleep();  // process the action
+        // The children check their size in the same animation frame
+        flush_frames();
+        sizes();
+    """)
+    assert lines == ['[100,100,100,100]', '[200,200,200,200]']
+
+
+
+## Events
+
+
+class TouchTester(flx.Widget):
+
+    _touch_passive = False
+
+    @flx.emitter
+    def pointer_down(self, e):
+        e.preventDefault()
+        return super().pointer_down(e)
+
+
+class PassiveTouchTester(TouchTester):
+
+    _touch_passive = True
+
+
+class EventTester(flx.Widget):
+
+    def init(self):
+        self.inner = flx.Widget(title='inner')
+        self.touch1 = TouchTester()
+        self.touch2 = PassiveTouchTester()
+        self.combo = flx.ComboBox(options=['a', 'b'], title='combo')
+        with flx.TreeWidget():
+            self.item = flx.TreeItem(title='item')
+
+    @flx.reaction('pointer_click', 'inner.pointer_click', 'combo.key_down',
+                  'item.pointer_click')
+    def _log_events(self, *events):
+        for ev in events:
+            name = 'outer' if ev.source is self else ev.source.title
+            window.events.append(name + ' ' + ev.type + ' ' + (ev.key or ''))
+
+
+def test_event_delegation():
+    lines = run_in_dom(EventTester, """
+        window.events = [];
+        var show = async function () {
+            await settle();
+            log(window.events);
+            window.events = [];
+        };
+        var span = document.createElement('span');
+        app.inner.node.appendChild(span);
+        // Emitters are called for the target's widget, then its parents
+        span.dispatchEvent(new Event('click'));
+        await show();
+        // A listener that stops propagation stops the emitters, also when
+        // it is on the widget's own node.
+        var stop = function (e) { e.stopPropagation(); };
+        span.addEventListener('click', stop);
+        span.dispatchEvent(new Event('click'));
+        await show();
+        span.removeEventListener('click', stop);
+        app.inner.node.addEventListener('click', stop);
+        span.dispatchEvent(new Event('click'));
+        await show();
+        // Only widgets that need it get a non-passive touch listener
+        var touches = [{clientX: 1, clientY: 1, identifier: 1, force: 1}];
+        var e1 = new Event('touchstart', {changedTouches: touches});
+        var e2 = new Event('touchstart', {changedTouches: touches});
+        app.touch1.node.dispatchEvent(e1);
+        app.touch2.node.dispatchEvent(e2);
+        log(e1.defaultPrevented, e2.defaultPrevented);
+        // Widgets that stop the propagation themselves still emit
+        app.combo.node.dispatchEvent(new Event('keydown', {key: 'ArrowDown'}));
+        app.combo.node.dispatchEvent(new Event('keydown', {key: 'a'}));
+        await show();
+        var row = app.item.node;
+        row.dispatchEvent(new Event('click'));
+        row.querySelector('.collapsebut').dispatchEvent(new Event('click'));
+        await show();
+    """)
+    assert lines == ['["inner pointer_click ","outer pointer_click "]',
+                     '[]',
+                     '[]',
+                     'true false',
+                     '["combo key_down ArrowDown","combo key_down a"]',
+                     '["item pointer_click ","item pointer_click "]',
+                     ]
+
+
+
+class ModifierTester(flx.Widget):
+
+    def init(self):
+        self.inner = flx.Widget(title='inner')
+
+    @flx.reaction('pointer_click', 'inner.pointer_click')
+    def _log_events(self, *events):
+        for ev in events:
+            ev.modifiers.append('X')  # must not affect other events
+            window.events.append(ev.modifiers)
+
+
+def test_event_modifiers():
+    lines = run_in_dom(ModifierTester, """
+        window.events = [];
+        for (var i = 0; i < 2; i++) {
+            app.inner.node.dispatchEvent(new Event('click', {shiftKey: true}));
+        }
+        await settle();
+        log(window.events);
+    """)
+    assert lines == ['[["Shift","X"],["Shift","X"],["Shift","X"],["Shift","X"]]']
+
+
+class MoveOverloader(flx.Widget):
+
+    @flx.emitter
+    def pointer_move(self, e):
+        ev = super().pointer_move(e)
+        window.moves.append(ev.pos[0])
+        return ev
+
+
+class MoveTester(flx.Widget):
+
+    def init(self):
+        self.plain = flx.Widget(title='plain')
+        self.custom = MoveOverloader(title='custom')
+
+    @flx.reaction('plain.pointer_move', 'plain.pointer_wheel',
+                  'custom.pointer_move')
+    def _log_events(self, *events):
+        for ev in events:
+            window.events.append([ev.source.title, ev.type, ev.pos[0],
+                                  ev.vscroll or 0])
+
+
+def test_pointer_move_and_wheel():
+    lines = run_in_dom(MoveTester, """
+        window.events = [];
+        window.moves = [];
+        var move = function (node, x) {
+            var touches = [{clientX: x, clientY: 1, identifier: 1, force: 1}];
+            node.dispatchEvent(new Event('touchmove', {changedTouches: touches}));
+        };
+        for (var x = 1; x <= 3; x++) {
+            move(app.plain.node, x);
+            move(app.custom.node, x);
+        }
+        // An overloaded emitter gets each event, and super() returns it
+        log(window.moves);
+        // Otherwise, only the last move in a frame is emitted
+        await settle();
+        log(window.events);
+        window.events = [];
+        // Wheel events in one frame are combined
+        for (var i = 0; i < 3; i++) {
+            app.plain.node.dispatchEvent(new Event('wheel', {clientX: 4, deltaY: 2}));
+        }
+        await settle();
+        log(window.events);
+    """)
+    assert lines == ['[1,2,3]',
+                     '[["custom","pointer_move",1,0],["custom","pointer_move",2,0],'
+                     '["custom","pointer_move",3,0],["plain","pointer_move",3,0]]',
+                     '[["plain","pointer_wheel",4,6]]',
+                     ]
+
+
+run_tests_if_main()
@@ -57,6 +57,9 @@ class CanvasWidget(Widget):
 
     DEFAULT_MIN_SIZE = 50, 50
 
+    _wheel_passive = False  # see pointer_wheel()
+    _touch_passive = False  # see _on_move()
+
     CSS = """
     .flx-CanvasWidget {
         -webkit-user-select: none;
@@ -125,6 +128,13 @@ class CanvasWidget(Widget):
             e.preventDefault()
         return super()._create_pointer_event(e)
 
+    def _on_move(self, e):
+        # Move events are emitted in the next animation frame, or dropped if
+        # nobody listens. So prevent the default (e.g. scrolling) here.
+        if e.type.startswith('touch'):
+            e.preventDefault()
+        super()._on_move(e)
+
     @event.emitter
     def pointer_wheel(self, e):
         global window
@@ -438,6 +438,7 @@ class ComboBox(BaseDropdown):
         # the line edit of an editable combobox.
         if not self.node.classList.contains('expanded'):
             if key in ['ArrowUp', 'ArrowDown']:
+                self.key_down(e)  # it won't reach the document listener
                 e.stopPropagation()
                 self.expand()
             return
@@ -447,6 +448,7 @@ class ComboBox(BaseDropdown):
             return
 
         # Consume the keys
+        self.key_down(e)  # it won't reach the document listener
         e.preventDefault()
         e.stopPropagation()
 
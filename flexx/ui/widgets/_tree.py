@@ -608,19 +608,16 @@ class TreeItem(Widget):
         return self.text
 
     def _on_click(self, e):
-        # Handle JS mouse click event
+        # Handle JS mouse click event. Because we stop the propagation, the
+        # event does not reach the document, so we emit pointer_click here.
         e.stopPropagation()  # don't click parent items
         if e.target.classList.contains('collapsebut'):
             self.user_collapsed(not self.collapsed)
         elif e.target.classList.contains('checkbut'):
             self.user_checked(not self.checked)
-        else:
-            self.pointer_click(e)
+        self.pointer_click(e)
 
     def _on_double_click(self, e):
-        # Handle JS mouse double click event
+        # Handle JS mouse double click event (see _on_click)
         e.stopPropagation()  # don't click parent items
-        c1 = e.target.classList.contains('collapsebut')
-        c2 = e.target.classList.contains('checkbut')
-        if not (c1 or c2):
-            self.pointer_double_click(e)
+        self.pointer_double_click(e)